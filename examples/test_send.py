@@ -25,12 +25,13 @@ logging.basicConfig(level=logging.INFO)
 
 thread_pool = spead2.ThreadPool()
 stream = spead2.send.UdpStream(
-    thread_pool, "127.0.0.1", 8888, spead2.send.StreamConfig(rate=1e7))
+    thread_pool, "127.0.0.1", 8888,
+    spead2.send.StreamConfig(max_packet_size=9000, rate=1e7))
 del thread_pool
 
 shape = (40, 50)
 ig = spead2.send.ItemGroup(flavour=spead2.Flavour(4, 64, 48, spead2.BUG_COMPAT_PYSPEAD_0_5_2))
 item = ig.add_item(0x1234, 'foo', 'a foo item', shape=shape, dtype=np.int32)
-item.value = np.zeros(shape, np.int32)
+item.value = spead2.aligned_empty(shape, np.int32)  # Contents are arbitrary
 stream.send_heap(ig.get_heap())
 stream.send_heap(ig.get_end())
@@ -49,6 +49,8 @@ class heap;
 struct packet
 {
     std::unique_ptr<std::uint8_t[]> data;
+    /// Number of bytes allocated for @a data
+    std::size_t data_capacity = 0;
     std::vector<boost::asio::const_buffer> buffers;
 };
 
@@ -81,6 +83,15 @@ public:
     packet_generator(const heap &h, item_pointer_t cnt, std::size_t max_packet_size);
 
     packet next_packet();
+
+    /**
+     * Generate the next packet into @a out. This is equivalent to assigning
+     * the return value of @ref next_packet, but reuses the memory already
+     * held by @a out where possible. Reusing the same few packets keeps
+     * the header data hot in the cache and avoids a memory allocation per
+     * packet.
+     */
+    void next_packet(packet &out);
 };
 
 } // namespace send
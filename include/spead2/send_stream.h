@@ -196,13 +196,36 @@ private:
     /// Increment to next_cnt after each heap
     item_pointer_t step_cnt = 1;
     std::unique_ptr<packet_generator> gen; // TODO: make this inlinable
-    /// Packet undergoing transmission by send_next_packet
-    packet current_packet;
+    /// Packets undergoing transmission by send_next_packet
+    std::vector<packet> current_packets;
     /// Signalled whenever the last heap is popped from the queue
     std::condition_variable heap_empty;
 
+protected:
+    /**
+     * Maximum number of packets that will be passed to a single call to
+     * @c async_send_packets. Derived classes that can send several packets
+     * at once (with a single system call, for example) should shadow this
+     * and @ref async_send_packets.
+     */
+    static constexpr std::size_t max_batch = 1;
+
+    /**
+     * Send @a n packets starting at @a pkts, and call @a handler with the
+     * total number of bytes transferred. This default implementation only
+     * handles a single packet, and forwards it to @c async_send_packet.
+     */
+    template<typename Handler>
+    void async_send_packets(const packet *pkts, std::size_t n, Handler &&handler)
+    {
+        assert(n == 1);
+        (void) n;
+        static_cast<Derived *>(this)->async_send_packet(pkts[0], std::forward<Handler>(handler));
+    }
+
+private:
     /**
-     * Asynchronously send the next packet from the current heap
+     * Asynchronously send the next batch of packets from the current heap
      * (or the next heap, if the current one is finished).
      *
      * @param ec Error from sending the previous packet. If set, the rest of the
@@ -215,8 +238,27 @@ private:
         {
             assert(gen);
             again = false;
-            current_packet = gen->next_packet();
-            if (ec || current_packet.buffers.empty())
+            std::size_t n_packets = 0;
+            if (!ec)
+            {
+                std::uint64_t batch_bytes = 0;
+                while (n_packets < current_packets.size())
+                {
+                    gen->next_packet(current_packets[n_packets]);
+                    if (current_packets[n_packets].buffers.empty())
+                        break;
+                    batch_bytes += boost::asio::buffer_size(current_packets[n_packets].buffers);
+                    n_packets++;
+                    /* Don't let a batch run past the end of the current
+                     * burst, so that rate limiting still applies at
+                     * (roughly) burst granularity.
+                     */
+                    if (config.get_rate() > 0.0
+                        && rate_bytes + batch_bytes >= config.get_burst_size())
+                        break;
+                }
+            }
+            if (n_packets == 0)
             {
                 // Reached the end of a heap. Pop the current one, and start the
                 // next one if there is one.
@@ -239,8 +281,11 @@ private:
                 if (empty)
                 {
                     heap_empty.notify_all();
-                    // Avoid hanging on to data indefinitely
-                    current_packet = packet();
+                    /* Avoid hanging on to pointers into the heap. The
+                     * packets' own storage is kept for reuse.
+                     */
+                    for (packet &pkt : current_packets)
+                        pkt.buffers.clear();
                 }
                 again = !empty;  // Start again on the next heap
                 lock.unlock();
@@ -253,8 +298,8 @@ private:
             }
             else
             {
-                static_cast<Derived *>(this)->async_send_packet(
-                    current_packet,
+                static_cast<Derived *>(this)->async_send_packets(
+                    current_packets.data(), n_packets,
                     [this] (const boost::system::error_code &ec, std::size_t bytes_transferred)
                     {
                         if (ec)
@@ -304,7 +349,8 @@ public:
             config(config),
             seconds_per_byte_burst(config.get_burst_rate() > 0.0 ? 1.0 / config.get_burst_rate() : 0.0),
             seconds_per_byte(config.get_rate() > 0.0 ? 1.0 / config.get_rate() : 0.0),
-            timer(get_io_service())
+            timer(get_io_service()),
+            current_packets(Derived::max_batch)
     {
     }
 
@@ -376,6 +422,9 @@ public:
     }
 };
 
+template<typename Derived>
+constexpr std::size_t stream_impl<Derived>::max_batch;
+
 } // namespace send
 } // namespace spead2
 
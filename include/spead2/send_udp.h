@@ -21,8 +21,22 @@
 #ifndef SPEAD2_SEND_UDP_H
 #define SPEAD2_SEND_UDP_H
 
+#ifndef _GNU_SOURCE
+# define _GNU_SOURCE
+#endif
+#include <spead2/common_features.h>
+#if SPEAD2_USE_SENDMMSG
+# include <sys/socket.h>
+# include <sys/types.h>
+#endif
+#if SPEAD2_USE_SENDMMSG && SPEAD2_USE_GSO
+# include <netinet/in.h>
+# include <netinet/udp.h>
+# include <cstdint>
+#endif
 #include <boost/asio.hpp>
 #include <utility>
+#include <vector>
 #include <spead2/send_packet.h>
 #include <spead2/send_stream.h>
 
@@ -44,6 +58,62 @@ private:
         socket.async_send_to(pkt.buffers, endpoint, std::move(handler));
     }
 
+#if SPEAD2_USE_SENDMMSG
+    /// Number of packets to send in one go
+    static constexpr std::size_t max_batch = 64;
+
+    /// sendmmsg control structures, one per packet in the current batch
+    std::vector<mmsghdr> msgvec;
+    /// Scatter-gather arrays referenced by @ref msgvec
+    std::vector<iovec> msg_iov;
+    /// Packets in the current batch
+    const packet *msg_pkts = nullptr;
+    /// Number of packets in @ref msg_pkts
+    std::size_t msg_npkts = 0;
+    /// Number of messages in @ref msgvec
+    std::size_t msg_count = 0;
+    /// Index of the first message in @ref msgvec not yet sent
+    std::size_t msg_next = 0;
+    /// Bytes sent so far in the current batch
+    std::size_t msg_bytes = 0;
+    /// Handler to call when the current batch is complete
+    completion_handler msg_handler;
+
+#if SPEAD2_USE_GSO
+    /// Storage for a UDP_SEGMENT control message
+    union gso_control
+    {
+        cmsghdr align;
+        char buf[CMSG_SPACE(sizeof(std::uint16_t))];
+    };
+
+    /// Largest UDP payload that can be sent as a single GSO message
+    static constexpr std::size_t max_gso_size = 65507;
+    /// Whether to coalesce equal-sized packets with UDP_SEGMENT
+    bool gso_enabled = false;
+    /// Control messages referenced by @ref msgvec
+    std::vector<gso_control> msg_control;
+    /// Index into @ref msg_pkts of the first packet of each message
+    std::vector<std::size_t> msg_first;
+#endif
+
+    /**
+     * Fill in @ref msgvec for the packets of the current batch starting
+     * from @a first. If GSO is enabled, runs of equal-sized packets are
+     * combined into a single message.
+     */
+    void prepare_mmsg(std::size_t first);
+
+    /**
+     * Send as much of the current batch as the socket will accept without
+     * blocking, and either wait for it to become writable again or call
+     * @ref msg_handler if the batch is complete.
+     */
+    void send_mmsg();
+
+    void async_send_packets(const packet *pkts, std::size_t n, completion_handler &&handler);
+#endif
+
 public:
     /// Socket send buffer size, if none is explicitly passed to the constructor
     static constexpr std::size_t default_buffer_size = 512 * 1024;
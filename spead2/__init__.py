@@ -91,6 +91,37 @@ def parse_range_list(ranges):
     return out
 
 
+def aligned_empty(shape, dtype=float, alignment=64):
+    """Create an uninitialised array whose data is aligned to a multiple of
+    `alignment` bytes. Aligning to a cache line allows copies in and out of
+    the array (for example, into packets) to use aligned loads and stores.
+
+    Parameters
+    ----------
+    shape : int or sequence of ints
+        Shape of the new array
+    dtype : numpy data type, optional
+        Data type of the new array
+    alignment : int, optional
+        Required alignment in bytes, which must be a power of 2
+
+    Raises
+    ------
+    ValueError
+        if `alignment` is not a power of 2
+    """
+    if alignment <= 0 or (alignment & (alignment - 1)):
+        raise ValueError('alignment must be a power of 2')
+    if isinstance(shape, _numbers.Integral):
+        shape = (shape,)
+    shape = tuple(shape)
+    dtype = _np.dtype(dtype)
+    nbytes = _shape_elements(shape) * dtype.itemsize
+    raw = _np.empty(nbytes + alignment, _np.uint8)
+    offset = -raw.ctypes.data % alignment
+    return raw[offset : offset + nbytes].view(dtype).reshape(shape)
+
+
 class Descriptor(object):
     """Metadata for a SPEAD item.
 
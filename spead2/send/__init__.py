@@ -137,6 +137,10 @@ class HeapGenerator(object):
 
     def get_end(self):
         """Return a heap that contains only an end-of-stream marker.
+
+        The marker must be sent in a heap of its own, rather than added to
+        a heap of data: receivers stop the stream as soon as they see it,
+        and do not pass on the heap that carries it.
         """
         heap = Heap(self._flavour)
         heap.add_end()
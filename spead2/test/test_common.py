@@ -92,6 +92,32 @@ class TestFlavour(object):
         assert_false(flavour1 == flavour3)
 
 
+class TestAlignedEmpty(object):
+    def test_alignment(self):
+        for alignment in [1, 8, 64, 4096]:
+            array = spead2.aligned_empty((3, 5), np.int16, alignment)
+            assert_equal(0, array.ctypes.data % alignment)
+            assert_equal((3, 5), array.shape)
+            assert_equal(np.dtype(np.int16), array.dtype)
+            assert_true(array.flags.c_contiguous)
+            assert_true(array.flags.writeable)
+
+    def test_scalar_shape(self):
+        array = spead2.aligned_empty(7, np.float32)
+        assert_equal((7,), array.shape)
+        assert_equal(0, array.ctypes.data % 64)
+
+    def test_empty(self):
+        array = spead2.aligned_empty((0, 4), np.float64)
+        assert_equal((0, 4), array.shape)
+
+    def test_bad_alignment(self):
+        with assert_raises(ValueError):
+            spead2.aligned_empty(4, np.uint8, 48)
+        with assert_raises(ValueError):
+            spead2.aligned_empty(4, np.uint8, 0)
+
+
 class TestItem(object):
     """Tests for :py:class:`spead2.Item`.
 
@@ -109,6 +135,19 @@ class TestItem(object):
         assert_raises(UnicodeEncodeError, item1.to_buffer)
         assert_raises(UnicodeEncodeError, item2.to_buffer)
 
+    def test_numpy_to_buffer_no_copy(self):
+        """Items on the numpy fast path are sent directly from the original
+        array, without being copied or bit-packed."""
+        value = np.arange(12, dtype=np.float64).reshape(3, 4)
+        item = spead2.Item(0x1000, 'name', 'description', (3, 4), value.dtype, value=value)
+        assert_is(value, item.to_buffer())
+        value = np.asfortranarray(value)
+        item = spead2.Item(0x1000, 'name', 'description', (3, 4), value.dtype,
+                           order='F', value=value)
+        buffer = item.to_buffer()
+        assert_is(value, buffer.base)
+        assert_true(buffer.flags.c_contiguous)
+
     def test_format_and_dtype(self):
         """Specifying both a format and dtype raises :py:exc:`ValueError`."""
         assert_raises(ValueError, spead2.Item, 0x1000, 'name', 'description',
@@ -53,21 +53,32 @@ except ImportError:
             return ret
 
 
-def _assert_items_equal(item1, item2):
-    assert_equal(item1.id, item2.id)
-    assert_equal(item1.name, item2.name)
-    assert_equal(item1.description, item2.description)
-    assert_equal(item1.shape, item2.shape)
-    assert_equal(item1.format, item2.format)
+# Payload for test_numpy_large. It is generated once (with a fixed seed, so
+# that failures are reproducible) rather than for every transport.
+_large_data = spead2.aligned_empty((100, 200), np.float32)
+_large_data[:] = np.random.RandomState(0).randn(100, 200)
+
+
+def _item_metadata(item):
+    """Collect the descriptor fields of an item into a tuple, so that they
+    can be compared with a single assertion."""
+    dtype = item.dtype
     # Byte order need not match, provided that values are received correctly
-    if item1.dtype is not None and item2.dtype is not None:
-        assert_equal(item1.dtype.newbyteorder('<'), item2.dtype.newbyteorder('<'))
-    else:
-        assert_equal(item1.dtype, item2.dtype)
-    assert_equal(item1.order, item2.order)
-    # Comparing arrays has many issues. Convert them to lists where appropriate
+    if dtype is not None:
+        dtype = dtype.newbyteorder('<')
+    return (item.id, item.name, item.description, item.shape, item.format,
+            dtype, item.order)
+
+
+def _assert_items_equal(item1, item2):
+    assert_equal(_item_metadata(item1), _item_metadata(item2))
     value1 = item1.value
     value2 = item2.value
+    if isinstance(value1, np.ndarray) and isinstance(value2, np.ndarray):
+        # Compare in numpy rather than building Python lists
+        np.testing.assert_array_equal(value1, value2)
+        return
+    # Comparing arrays has many issues. Convert them to lists where appropriate
     if hasattr(value1, 'tolist'):
         value1 = value1.tolist()
     if hasattr(value2, 'tolist'):
@@ -76,9 +87,9 @@ def _assert_items_equal(item1, item2):
 
 
 def assert_item_groups_equal(item_group1, item_group2):
-    assert_equal(sorted(item_group1.keys()), sorted(item_group2.keys()))
-    for key in item_group1.keys():
-        _assert_items_equal(item_group1[key], item_group2[key])
+    assert_equal(set(item_group1.keys()), set(item_group2.keys()))
+    for key, item in item_group1.items():
+        _assert_items_equal(item, item_group2[key])
 
 
 @decorator
@@ -113,6 +124,16 @@ class BaseTestPassthrough(object):
 
     is_legacy_send = False
     is_legacy_receive = False
+    # Number of threads in the thread pool shared by the tests in the class
+    thread_pool_threads = 2
+
+    @classmethod
+    def setup_class(cls):
+        cls.thread_pool = spead2.ThreadPool(cls.thread_pool_threads)
+
+    @classmethod
+    def teardown_class(cls):
+        del cls.thread_pool
 
     def _test_item_group(self, item_group, memcpy=spead2.MEMCPY_STD, allocator=None):
         received_item_group = self.transmit_item_group(item_group, memcpy, allocator)
@@ -135,7 +156,7 @@ class BaseTestPassthrough(object):
         uses non-temporal copies, a custom allocator, and a memory pool,
         to test that those all work."""
         ig = spead2.send.ItemGroup()
-        data = np.random.randn(100, 200)
+        data = _large_data
         ig.add_item(id=0x2345, name='name', description='description',
                     shape=data.shape, dtype=data.dtype, value=data)
         allocator = spead2.MmapAllocator()
@@ -235,12 +256,16 @@ class BaseTestPassthrough(object):
 
 class TestPassthroughUdp(BaseTestPassthrough):
     def transmit_item_group(self, item_group, memcpy, allocator):
-        thread_pool = spead2.ThreadPool(2)
+        # The UDP senders in these tests are not rate-limited, so they rely on
+        # the receiver's socket buffer holding a whole heap. The reader asks
+        # for 8 MiB, but without privileges the kernel clips that to
+        # net.core.rmem_max (typically about 208 KiB). That is still enough
+        # for the largest heap here (about 80 kB in 9000-byte packets).
         sender = spead2.send.UdpStream(
-                thread_pool, "localhost", 8888,
-                spead2.send.StreamConfig(rate=1e8),
+                self.thread_pool, "localhost", 8888,
+                spead2.send.StreamConfig(max_packet_size=9000, rate=0),
                 buffer_size=0)
-        receiver = spead2.recv.Stream(thread_pool)
+        receiver = spead2.recv.Stream(self.thread_pool)
         receiver.set_memcpy(memcpy)
         if allocator is not None:
             receiver.set_memory_allocator(allocator)
@@ -249,8 +274,12 @@ class TestPassthroughUdp(BaseTestPassthrough):
         sender.send_heap(gen.get_heap())
         sender.send_heap(gen.get_end())
         received_item_group = spead2.ItemGroup()
-        for heap in receiver:
-            received_item_group.update(heap)
+        while True:
+            heaps = receiver.get_batch(16)
+            if not heaps:
+                break
+            for heap in heaps:
+                received_item_group.update(heap)
         return received_item_group
 
 
@@ -270,12 +299,11 @@ class TestPassthroughUdp6(BaseTestPassthrough):
 
     def transmit_item_group(self, item_group, memcpy, allocator):
         self.check_ipv6()
-        thread_pool = spead2.ThreadPool(2)
         sender = spead2.send.UdpStream(
-                thread_pool, "::1", 8888,
-                spead2.send.StreamConfig(rate=1e8),
+                self.thread_pool, "::1", 8888,
+                spead2.send.StreamConfig(max_packet_size=9000, rate=0),
                 buffer_size=0)
-        receiver = spead2.recv.Stream(thread_pool)
+        receiver = spead2.recv.Stream(self.thread_pool)
         receiver.set_memcpy(memcpy)
         if allocator is not None:
             receiver.set_memory_allocator(allocator)
@@ -291,14 +319,13 @@ class TestPassthroughUdp6(BaseTestPassthrough):
 
 class TestPassthroughUdpCustomSocket(BaseTestPassthrough):
     def transmit_item_group(self, item_group, memcpy, allocator):
-        thread_pool = spead2.ThreadPool(2)
         send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sender = spead2.send.UdpStream(
-                thread_pool, "127.0.0.1", 8888,
-                spead2.send.StreamConfig(rate=1e8),
+                self.thread_pool, "127.0.0.1", 8888,
+                spead2.send.StreamConfig(max_packet_size=9000, rate=0),
                 buffer_size=0, socket=send_sock)
-        receiver = spead2.recv.Stream(thread_pool)
+        receiver = spead2.recv.Stream(self.thread_pool)
         receiver.set_memcpy(memcpy)
         if allocator is not None:
             receiver.set_memory_allocator(allocator)
@@ -316,14 +343,13 @@ class TestPassthroughUdpCustomSocket(BaseTestPassthrough):
 
 class TestPassthroughUdpMulticast(BaseTestPassthrough):
     def transmit_item_group(self, item_group, memcpy, allocator):
-        thread_pool = spead2.ThreadPool(2)
         mcast_group = '239.255.88.88'
         interface_address = '127.0.0.1'
         sender = spead2.send.UdpStream(
-                thread_pool, mcast_group, 8887,
-                spead2.send.StreamConfig(rate=1e8),
+                self.thread_pool, mcast_group, 8887,
+                spead2.send.StreamConfig(max_packet_size=9000, rate=0),
                 buffer_size=0, ttl=1, interface_address=interface_address)
-        receiver = spead2.recv.Stream(thread_pool)
+        receiver = spead2.recv.Stream(self.thread_pool)
         receiver.set_memcpy(memcpy)
         if allocator is not None:
             receiver.set_memory_allocator(allocator)
@@ -349,13 +375,12 @@ class TestPassthroughUdp6Multicast(TestPassthroughUdp6):
     def transmit_item_group(self, item_group, memcpy, allocator):
         self.check_ipv6()
         interface_index = self.get_interface_index()
-        thread_pool = spead2.ThreadPool(2)
         mcast_group = 'ff14::1234'
         sender = spead2.send.UdpStream(
-                thread_pool, mcast_group, 8887,
-                spead2.send.StreamConfig(rate=1e8),
+                self.thread_pool, mcast_group, 8887,
+                spead2.send.StreamConfig(rate=0),
                 buffer_size=0, ttl=0, interface_index=interface_index)
-        receiver = spead2.recv.Stream(thread_pool)
+        receiver = spead2.recv.Stream(self.thread_pool)
         receiver.set_memcpy(memcpy)
         if allocator is not None:
             receiver.set_memory_allocator(allocator)
@@ -371,31 +396,33 @@ class TestPassthroughUdp6Multicast(TestPassthroughUdp6):
 
 class TestPassthroughMem(BaseTestPassthrough):
     def transmit_item_group(self, item_group, memcpy, allocator):
-        thread_pool = spead2.ThreadPool(2)
-        sender = spead2.send.BytesStream(thread_pool)
+        sender = spead2.send.BytesStream(self.thread_pool)
         gen = spead2.send.HeapGenerator(item_group)
         sender.send_heap(gen.get_heap())
         sender.send_heap(gen.get_end())
-        receiver = spead2.recv.Stream(thread_pool)
+        receiver = spead2.recv.Stream(self.thread_pool)
         receiver.set_memcpy(memcpy)
         if allocator is not None:
             receiver.set_memory_allocator(allocator)
         receiver.add_buffer_reader(sender.getvalue())
         received_item_group = spead2.ItemGroup()
-        for heap in receiver:
-            received_item_group.update(heap)
+        while True:
+            heaps = receiver.get_batch(16)
+            if not heaps:
+                break
+            for heap in heaps:
+                received_item_group.update(heap)
         return received_item_group
 
 
 class TestAllocators(BaseTestPassthrough):
     """Like TestPassthroughMem, but uses some custom allocators"""
     def transmit_item_group(self, item_group, memcpy, allocator):
-        thread_pool = spead2.ThreadPool(2)
-        sender = spead2.send.BytesStream(thread_pool)
+        sender = spead2.send.BytesStream(self.thread_pool)
         gen = spead2.send.HeapGenerator(item_group)
         sender.send_heap(gen.get_heap())
         sender.send_heap(gen.get_end())
-        receiver = spead2.recv.Stream(thread_pool)
+        receiver = spead2.recv.Stream(self.thread_pool)
         if allocator is not None:
             receiver.set_memory_allocator(allocator)
         receiver.set_memcpy(memcpy)
@@ -408,6 +435,7 @@ class TestAllocators(BaseTestPassthrough):
 
 class BaseTestPassthroughLegacySend(BaseTestPassthrough):
     is_legacy_send = True
+    thread_pool_threads = 1
 
     def transmit_item_group(self, item_group, memcpy, allocator):
         if not self.spead:
@@ -415,7 +443,11 @@ class BaseTestPassthroughLegacySend(BaseTestPassthrough):
         transport = io.BytesIO()
         sender = self.spead.Transmitter(transport)
         legacy_item_group = self.spead.ItemGroup()
-        for item in item_group.values():
+        mkfmt = self.spead.mkfmt
+        default_fmt = self.spead.DEFAULT_FMT
+        for name, item in item_group.items():
+            value = item.value
+            fmt = item.format
             # PySPEAD only supports either 1D variable or fixed-size
             if item.is_variable_size():
                 assert len(item.shape) == 1
@@ -424,16 +456,15 @@ class BaseTestPassthroughLegacySend(BaseTestPassthrough):
                 shape = item.shape
             legacy_item_group.add_item(
                     id=item.id,
-                    name=item.name,
+                    name=name,
                     description=item.description,
                     shape=shape,
-                    fmt=self.spead.mkfmt(*item.format) if item.format else self.spead.DEFAULT_FMT,
-                    ndarray=np.array(item.value) if not item.format else None)
-            legacy_item_group[item.name] = item.value
+                    fmt=mkfmt(*fmt) if fmt else default_fmt,
+                    ndarray=np.array(value) if not fmt else None)
+            legacy_item_group[name] = value
         sender.send_heap(legacy_item_group.get_heap())
         sender.end()
-        thread_pool = spead2.ThreadPool(1)
-        receiver = spead2.recv.Stream(thread_pool, bug_compat=spead2.BUG_COMPAT_PYSPEAD_0_5_2)
+        receiver = spead2.recv.Stream(self.thread_pool, bug_compat=spead2.BUG_COMPAT_PYSPEAD_0_5_2)
         receiver.set_memcpy(memcpy)
         if allocator is not None:
             receiver.set_memory_allocator(allocator)
@@ -454,12 +485,12 @@ class TestPassthroughLegacySend64_48(BaseTestPassthroughLegacySend):
 
 class BaseTestPassthroughLegacyReceive(BaseTestPassthrough):
     is_legacy_receive = True
+    thread_pool_threads = 1
 
     def transmit_item_group(self, item_group, memcpy, allocator):
         if not self.spead:
             raise SkipTest('spead module not importable')
-        thread_pool = spead2.ThreadPool(1)
-        sender = spead2.send.BytesStream(thread_pool)
+        sender = spead2.send.BytesStream(self.thread_pool)
         gen = spead2.send.HeapGenerator(item_group, flavour=self.flavour)
         sender.send_heap(gen.get_heap())
         sender.send_heap(gen.get_end())
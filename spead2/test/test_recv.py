@@ -690,6 +690,38 @@ class TestStream(object):
         assert_equal(0, stats.incomplete_heaps_flushed)
         assert_equal(0, stats.worker_blocked)
 
+    def test_get_batch(self):
+        """get_batch returns all the heaps, in order, in batches no larger
+        than requested, and then an empty list."""
+        thread_pool = spead2.ThreadPool(1)
+        sender = send.BytesStream(thread_pool)
+        ig = send.ItemGroup()
+        data = np.array([[6, 7, 8], [10, 11, 12000]], dtype=np.uint16)
+        ig.add_item(id=0x2345, name='name', description='description',
+                    shape=data.shape, dtype=data.dtype, value=data)
+        gen = send.HeapGenerator(ig)
+        for i in range(10):
+            sender.send_heap(gen.get_heap(data='all'))
+        sender.send_heap(gen.get_end())
+        receiver = spead2.recv.Stream(thread_pool, ring_heaps=8)
+        receiver.add_buffer_reader(sender.getvalue())
+        heaps = []
+        while True:
+            batch = receiver.get_batch(3)
+            assert_less_equal(len(batch), 3)
+            if not batch:
+                break
+            heaps.extend(batch)
+        assert_equal(list(range(1, 11)), [heap.cnt for heap in heaps])
+        assert_equal([], receiver.get_batch(3))
+
+    def test_get_batch_zero(self):
+        """get_batch with max_heaps=0 raises ValueError"""
+        receiver = spead2.recv.Stream(spead2.ThreadPool())
+        with assert_raises(ValueError):
+            receiver.get_batch(0)
+
+
 class TestUdpStream(object):
     def test_out_of_range_udp_port(self):
         receiver = spead2.recv.Stream(spead2.ThreadPool())
@@ -17,13 +17,16 @@ from __future__ import division, print_function
 import spead2
 import spead2.send as send
 import struct
+import socket
 import binascii
 import numpy as np
 import weakref
 import threading
 import time
 import gc
+import netifaces
 from nose.tools import *
+from nose.plugins.skip import SkipTest
 
 
 def hexlify(data):
@@ -457,3 +460,79 @@ class TestStream(object):
                     struct.pack('B', 0)
                 ])
         assert_equal(hexlify(expected), hexlify(self.stream.getvalue()))
+
+
+class TestUdpStream(object):
+    def setup(self):
+        self.flavour = Flavour(4, 64, 48, 0)
+        self.thread_pool = spead2.ThreadPool()
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
+        self.receiver.settimeout(5)
+
+    def teardown(self):
+        self.receiver.close()
+
+    @classmethod
+    def get_interface_address(cls):
+        for iface in netifaces.interfaces():
+            for addr in netifaces.ifaddresses(iface).get(netifaces.AF_INET, []):
+                if not addr['addr'].startswith('127.'):
+                    return addr['addr']
+        raise SkipTest('could not find suitable interface for test')
+
+    def make_heap(self, size):
+        ig = send.ItemGroup(flavour=self.flavour)
+        ig.add_item(0x1000, 'test', 'An item', shape=(size,), dtype=np.uint8,
+                    value=np.arange(size).astype(np.uint8))
+        return ig.get_heap()
+
+    def test_packet_boundaries(self):
+        """Each packet must arrive as its own datagram, even when runs of
+        packets are coalesced into a single message for sending.
+
+        The heap sizes give a single packet, runs of full-sized packets
+        ending in a shorter one, and a run too long to send as one message.
+        """
+        self.receiver.bind(('127.0.0.1', 0))
+        port = self.receiver.getsockname()[1]
+        stream = send.UdpStream(
+            self.thread_pool, '127.0.0.1', port,
+            send.StreamConfig(max_packet_size=9000), buffer_size=0)
+        for cnt, size in enumerate([10, 30000, 20000, 100000], 1):
+            heap = self.make_heap(size)
+            expected = list(send.PacketGenerator(heap, cnt, 9000))
+            stream.send_heap(heap)
+            received = [self.receiver.recv(65536) for i in range(len(expected))]
+            assert_equal([len(packet) for packet in expected], [len(packet) for packet in received])
+            assert_equal(expected, received)
+
+    def test_send_buffer_full(self):
+        """All packets must be sent when the socket buffer fills up and the
+        stream has to wait for space.
+
+        Loopback frees buffer space as soon as a packet is sent, so this
+        sends multicast out of a real interface, and receives the looped
+        back copy.
+        """
+        interface_address = self.get_interface_address()
+        mcast_group = '239.255.88.90'
+        self.receiver.bind(('', 0))
+        self.receiver.setsockopt(
+            socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+            socket.inet_aton(mcast_group) + socket.inet_aton(interface_address))
+        port = self.receiver.getsockname()[1]
+        stream = send.UdpStream(
+            self.thread_pool, mcast_group, port,
+            send.StreamConfig(max_packet_size=1024, rate=0), buffer_size=4096,
+            ttl=1, interface_address=interface_address)
+        heap = self.make_heap(256 * 1024)
+        expected = list(send.PacketGenerator(heap, 1, 1024))
+        # Receive concurrently, so that the receive buffer does not overflow
+        thread = threading.Thread(target=stream.send_heap, args=(heap,))
+        thread.start()
+        try:
+            received = [self.receiver.recv(65536) for i in range(len(expected))]
+        finally:
+            thread.join()
+        assert_equal(expected, received)
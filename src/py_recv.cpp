@@ -164,6 +164,27 @@ public:
         return to_object(try_pop_live());
     }
 
+    py::list get_batch(std::size_t max_heaps)
+    {
+        if (max_heaps == 0)
+            throw std::invalid_argument("max_heaps cannot be 0");
+        py::list out;
+        try
+        {
+            // Only the first heap is waited for
+            out.append(to_object(ring_stream::pop_live()));
+            for (std::size_t i = 1; i < max_heaps; i++)
+                out.append(to_object(try_pop_live()));
+        }
+        catch (ringbuffer_empty &e)
+        {
+        }
+        catch (ringbuffer_stopped &e)
+        {
+        }
+        return out;
+    }
+
     int get_fd() const
     {
         return get_ringbuffer().get_data_sem().get_fd();
@@ -372,6 +393,7 @@ py::module register_module(py::module &parent)
         .def("__next__", SPEAD2_PTMF(ring_stream_wrapper, next))
         .def("get", SPEAD2_PTMF(ring_stream_wrapper, get))
         .def("get_nowait", SPEAD2_PTMF(ring_stream_wrapper, get_nowait))
+        .def("get_batch", SPEAD2_PTMF(ring_stream_wrapper, get_batch), "max_heaps"_a)
         .def("set_memory_allocator", SPEAD2_PTMF(ring_stream_wrapper, set_memory_allocator),
              "allocator"_a)
         .def("set_memory_pool", SPEAD2_PTMF(ring_stream_wrapper, set_memory_pool),
@@ -416,7 +416,10 @@ public:
 
     py::bytes getvalue() const
     {
-        return str();
+        /* Copy straight out of the put area, rather than via str(), which
+         * would make a temporary std::string copy first.
+         */
+        return py::bytes(pbase(), pptr() - pbase());
     }
 };
 
@@ -93,7 +93,13 @@ packet_generator::packet_generator(
 packet packet_generator::next_packet()
 {
     packet out;
+    next_packet(out);
+    return out;
+}
 
+void packet_generator::next_packet(packet &out)
+{
+    out.buffers.clear();
     if (payload_offset < payload_size)
     {
         pointer_encoder encoder(h.get_flavour().get_heap_address_bits());
@@ -108,7 +114,11 @@ packet packet_generator::next_packet()
         // Determine how much internal data is needed.
         // Always add enough to allow for padding the payload
         std::size_t alloc_bytes = prefix_size + (n_item_pointers + 1) * sizeof(item_pointer_t);
-        out.data.reset(new std::uint8_t[alloc_bytes]);
+        if (out.data_capacity < alloc_bytes)
+        {
+            out.data.reset(new std::uint8_t[alloc_bytes]);
+            out.data_capacity = alloc_bytes;
+        }
         std::uint64_t *header = reinterpret_cast<std::uint64_t *>(out.data.get());
         *header = htobe<std::uint64_t>(
             (std::uint64_t(0x5304) << 48)
@@ -187,7 +197,6 @@ packet packet_generator::next_packet()
             }
         }
     }
-    return out;
 }
 
 } // namespace send
@@ -14,11 +14,23 @@
  * along with this program.  If not, see <http://www.gnu.org/licenses/>.
  */
 
+#ifndef _GNU_SOURCE
+# define _GNU_SOURCE
+#endif
+#include <spead2/common_features.h>
+#if SPEAD2_USE_SENDMMSG
+# include <sys/socket.h>
+# include <sys/types.h>
+# include <cerrno>
+# include <cstring>
+#endif
 #include <cstddef>
 #include <utility>
+#include <functional>
 #include <boost/asio.hpp>
 #include <spead2/send_udp.h>
 #include <spead2/common_defines.h>
+#include <spead2/common_logging.h>
 
 namespace spead2
 {
@@ -26,6 +38,12 @@ namespace send
 {
 
 constexpr std::size_t udp_stream::default_buffer_size;
+#if SPEAD2_USE_SENDMMSG
+constexpr std::size_t udp_stream::max_batch;
+# if SPEAD2_USE_GSO
+constexpr std::size_t udp_stream::max_gso_size;
+# endif
+#endif
 
 udp_stream::udp_stream(
     io_service_ref io_service,
@@ -134,9 +152,29 @@ udp_stream::udp_stream(
     std::size_t buffer_size)
     : stream_impl<udp_stream>(std::move(io_service), config),
     socket(std::move(socket)), endpoint(endpoint)
+#if SPEAD2_USE_SENDMMSG
+    , msgvec(max_batch)
+# if SPEAD2_USE_GSO
+    , msg_control(max_batch), msg_first(max_batch)
+# endif
+#endif
 {
     if (&get_io_service() != &this->socket.get_io_service())
         throw std::invalid_argument("I/O service does not match the socket's I/O service");
+#if SPEAD2_USE_SENDMMSG
+    for (mmsghdr &msg : msgvec)
+        std::memset(&msg, 0, sizeof(msg));
+# if SPEAD2_USE_GSO
+    /* Kernels without UDP_SEGMENT support silently ignore the control
+     * message and would send one oversized datagram, so check that the
+     * socket option is recognised before using it.
+     */
+    int gso_size;
+    socklen_t gso_size_len = sizeof(gso_size);
+    gso_enabled = getsockopt(this->socket.native_handle(), IPPROTO_UDP, UDP_SEGMENT,
+                             &gso_size, &gso_size_len) == 0;
+# endif
+#endif
     if (buffer_size != 0)
     {
         boost::asio::socket_base::send_buffer_size option(buffer_size);
@@ -161,5 +199,157 @@ udp_stream::udp_stream(
     }
 }
 
+#if SPEAD2_USE_SENDMMSG
+void udp_stream::async_send_packets(
+    const packet *pkts, std::size_t n, completion_handler &&handler)
+{
+    if (n == 1)
+    {
+        // No benefit to using sendmmsg
+        async_send_packet(pkts[0], std::move(handler));
+        return;
+    }
+
+    msg_pkts = pkts;
+    msg_npkts = n;
+    msg_bytes = 0;
+    msg_handler = std::move(handler);
+    prepare_mmsg(0);
+    send_mmsg();
+}
+
+void udp_stream::prepare_mmsg(std::size_t first)
+{
+    /* Fill in all the iovecs before pointing msgvec at them, since
+     * msg_iov could be reallocated while growing.
+     */
+    msg_iov.clear();
+    for (std::size_t i = first; i < msg_npkts; i++)
+        for (const auto &buffer : msg_pkts[i].buffers)
+        {
+            iovec iov;
+            iov.iov_base = const_cast<void *>(boost::asio::buffer_cast<const void *>(buffer));
+            iov.iov_len = boost::asio::buffer_size(buffer);
+            msg_iov.push_back(iov);
+        }
+    std::size_t offset = 0;
+    msg_count = 0;
+    msg_next = 0;
+    for (std::size_t i = first; i < msg_npkts; msg_count++)
+    {
+        msghdr &hdr = msgvec[msg_count].msg_hdr;
+        hdr.msg_name = (void *) endpoint.data();
+        hdr.msg_namelen = endpoint.size();
+        hdr.msg_iov = &msg_iov[offset];
+        hdr.msg_iovlen = 0;
+        hdr.msg_control = nullptr;
+        hdr.msg_controllen = 0;
+        std::size_t end = i + 1;
+#if SPEAD2_USE_GSO
+        msg_first[msg_count] = i;
+        if (gso_enabled)
+        {
+            /* Extend the message with following packets of the same size.
+             * The last segment may be shorter, but then it ends the message.
+             */
+            std::size_t segment_size = boost::asio::buffer_size(msg_pkts[i].buffers);
+            std::size_t total = segment_size;
+            while (end < msg_npkts)
+            {
+                std::size_t size = boost::asio::buffer_size(msg_pkts[end].buffers);
+                if (size > segment_size || total + size > max_gso_size)
+                    break;
+                total += size;
+                end++;
+                if (size < segment_size)
+                    break;
+            }
+            if (end - i > 1)
+            {
+                gso_control &control = msg_control[msg_count];
+                hdr.msg_control = control.buf;
+                hdr.msg_controllen = sizeof(control.buf);
+                cmsghdr *cmsg = CMSG_FIRSTHDR(&hdr);
+                cmsg->cmsg_level = IPPROTO_UDP;
+                cmsg->cmsg_type = UDP_SEGMENT;
+                cmsg->cmsg_len = CMSG_LEN(sizeof(std::uint16_t));
+                std::uint16_t segment_size16 = segment_size;
+                std::memcpy(CMSG_DATA(cmsg), &segment_size16, sizeof(segment_size16));
+            }
+        }
+#endif
+        for (; i < end; i++)
+            hdr.msg_iovlen += msg_pkts[i].buffers.size();
+        offset += hdr.msg_iovlen;
+    }
+}
+
+void udp_stream::send_mmsg()
+{
+    boost::system::error_code ec;
+    while (msg_next < msg_count)
+    {
+        int sent = sendmmsg(socket.native_handle(), msgvec.data() + msg_next,
+                            msg_count - msg_next, MSG_DONTWAIT);
+        log_debug("sendmmsg returned %1%", sent);
+        if (sent < 0)
+        {
+            if (errno == EINTR)
+                continue;
+            else if (errno == EAGAIN || errno == EWOULDBLOCK)
+            {
+                // Wait for space in the socket buffer, then try again
+                socket.async_send(
+                    boost::asio::null_buffers(),
+                    [this] (const boost::system::error_code &ec, std::size_t)
+                    {
+                        if (ec)
+                        {
+                            completion_handler handler = std::move(msg_handler);
+                            msg_handler = nullptr;
+                            handler(ec, msg_bytes);
+                        }
+                        else
+                            send_mmsg();
+                    });
+                return;
+            }
+#if SPEAD2_USE_GSO
+            else if ((errno == EINVAL || errno == EIO || errno == EMSGSIZE)
+                     && msgvec[msg_next].msg_hdr.msg_controllen != 0)
+            {
+                /* The kernel can refuse to segment, for example if the
+                 * segments would need IP fragmentation or the device lacks
+                 * checksum offload. Send the rest individually instead;
+                 * any genuine error will then be reported for the packet
+                 * that caused it.
+                 */
+                log_info("UDP GSO send failed (%1%), falling back to individual packets",
+                         std::strerror(errno));
+                gso_enabled = false;
+                prepare_mmsg(msg_first[msg_next]);
+                continue;
+            }
+#endif
+            else
+            {
+                ec = boost::system::error_code(errno, boost::asio::error::get_system_category());
+                break;
+            }
+        }
+        for (int i = 0; i < sent; i++)
+            msg_bytes += msgvec[msg_next + i].msg_len;
+        msg_next += sent;
+    }
+
+    /* Post rather than calling directly, to avoid unbounded recursion
+     * through send_next_packet when the socket never blocks.
+     */
+    completion_handler handler = std::move(msg_handler);
+    msg_handler = nullptr;
+    get_io_service().post(std::bind(std::move(handler), ec, msg_bytes));
+}
+#endif
+
 } // namespace send
 } // namespace spead2